@@ -1,9 +1,36 @@
 # -*- coding: utf-8 -*-
 
 import sys
-from datetime import datetime
-
-from employee_db import EmployeeDB
+from datetime import date
+from itertools import chain
+from time import perf_counter_ns
+
+from employee_db import EmployeeDB, calculate_age
+
+# Статичные части интерфейса собираются один раз при импорте
+MENU = """
+=== Employee Database ===
+1. Создать таблицу
+2. Добавить сотрудника
+3. Показать всех сотрудников
+4. Сгенерировать тестовые данные
+5. Найти мужчин с фамилией на F
+6. Оптимизация базы
+0. Выход
+========================"""
+
+TABLE_HEADER = "\n".join((
+    "\nСписок сотрудников:",
+    "=" * 65,
+    f"{'ФИО':<30} | {'Дата рождения':<12} | {'Пол':<6} | Возраст",
+    "-" * 65,
+))
+
+# ФИО, дата рождения, пол, возраст
+ROW_FMT = "{:<30} | {}    | {:<6} | {}"
+
+# Количество строк таблицы, выводимых одним вызовом write
+PRINT_BATCH = 4096
 
 
 def print_error(message):
@@ -18,93 +45,131 @@ def print_success(message):
 
 def print_menu():
     """Выводит меню программы"""
-    print("\n=== Employee Database ===")
-    print("1. Создать таблицу")
-    print("2. Добавить сотрудника")
-    print("3. Показать всех сотрудников")
-    print("4. Сгенерировать тестовые данные")
-    print("5. Найти мужчин с фамилией на F")
-    print("6. Оптимизация базы")
-    print("0. Выход")
-    print("========================")
+    print(MENU)
 
 
 def print_employees(employees):
-    """Выводит список сотрудников"""
-    if not employees:
+    """Выводит список сотрудников (список или итератор)"""
+    employees = iter(employees)
+    first = next(employees, None)
+    if first is None:
         print("\nНет данных о сотрудниках")
         return
 
-    print("\nСписок сотрудников:")
-    print("=" * 65)
-    print(f"{'ФИО':<30} | {'Дата рождения':<12} | {'Пол':<6} | Возраст")
-    print("-" * 65)
-
-    for emp in employees:
-        print(f"{emp['full_name']:<30} | {emp['birth_date']}    | {emp['gender']:<6} | {emp['age']}")
+    print(TABLE_HEADER)
+
+    # Строки выводятся пачками: один write на PRINT_BATCH строк вместо print на каждую
+    format_row = ROW_FMT.format
+    write = sys.stdout.write
+    today = date.today()
+    buf = []
+    for emp in chain((first,), employees):
+        buf.append(format_row(emp['full_name'], emp['birth_date'], emp['gender'], calculate_age(emp['birth_date'], today)))
+        if len(buf) >= PRINT_BATCH:
+            write("\n".join(buf) + "\n")
+            buf.clear()
+    if buf:
+        write("\n".join(buf) + "\n")
+
+
+def cmd_create_table(db):
+    db.create_table()
+    print_success("Таблица успешно создана")
+
+
+def cmd_add_employee(db, full_name, birth_date, gender):
+    if db.add_employee(full_name, birth_date, gender):
+        print_success("Сотрудник успешно добавлен")
+
+
+def cmd_list_employees(db):
+    print_employees(db.get_all_employees())
+
+
+def cmd_generate_test_data(db):
+    print("Генерируем 1.000.000 записей и 100 записей для 5-го пункта")
+    count = db.generate_test_data(1000000, 100)
+    print_success(f"Добавлено {count} тестовых записей")
+
+
+def cmd_query_male_f(db):
+    start_time = perf_counter_ns()
+    employees = db.query_male_f()
+    execution_time = (perf_counter_ns() - start_time) / 1e9
+
+    print_employees(employees)
+    print(f"\nВремя выполнения запроса: {execution_time:.4f} секунд")
+
+
+def cmd_optimize_database(db):
+    # Замеряем время до оптимизации
+    start_time = perf_counter_ns()
+    db.query_male_f()
+    time_before = (perf_counter_ns() - start_time) / 1e9
+
+    # Выполняем оптимизацию
+    if db.optimize_database():
+        # Замеряем время после оптимизации
+        start_time = perf_counter_ns()
+        db.query_male_f()
+        time_after = (perf_counter_ns() - start_time) / 1e9
+        print_success("База данных успешно оптимизирована")
+        print("\nРезультаты оптимизации:")
+        print(f"До оптимизации: {time_before:.4f} сек.")
+        print(f"После оптимизации: {time_after:.4f} сек.")
+        improvement = (time_before - time_after) / time_before * 100
+        print(f"Ускорение: {improvement:.1f}%")
+        print("\nСозданы индексы:")
+        print("- idx_gender_fullname_bd: покрывающий индекс для поиска по полу и началу ФИО")
+        print("- idx_fullname_bd: покрывающий индекс для списка сотрудников")
+
+
+# Режим -> (обработчик, подсказки для ввода аргументов в интерактивном режиме)
+COMMANDS = {
+    '1': (cmd_create_table, ()),
+    '2': (cmd_add_employee, ("ФИО: ", "Дата рождения (YYYY-MM-DD): ", "Пол (M/F): ")),
+    '3': (cmd_list_employees, ()),
+    '4': (cmd_generate_test_data, ()),
+    '5': (cmd_query_male_f, ()),
+    '6': (cmd_optimize_database, ()),
+}
+
+
+def print_usage():
+    """Выводит подсказку по аргументам командной строки"""
+    print_error("Неверные аргументы")
+    print("Примеры:")
+    print("  app.py 1 - создать таблицу")
+    print("  app.py 2 'Ivanov Ivan' 1990-05-15 M - добавить сотрудника")
+    print("  app.py 3 - вывести всех сотрудников")
+    print("  app.py 4 - генерация 1.000.000 записей с 100 записей для 5-го пункта")
+    print("  app.py 5 - вывести всех сотрудников мужского пола и у кого ФИО начинается на букву F")
+    print("  app.py 6 - выполнить оптимизацию базы")
 
 
 def handle_command(db, mode, args):
     """Обрабатывает команду из аргументов"""
+    command = COMMANDS.get(mode)
+    if command is None or len(args) < len(command[1]):
+        print_usage()
+        return
+
+    handler, prompts = command
     try:
-        if mode == '1':
-            db.create_table()
-            print_success("Таблица успешно создана")
-        elif mode == '2' and len(args) >= 3:
-            if db.add_employee(args[0], args[1], args[2]):
-                print_success("Сотрудник успешно добавлен")
-        elif mode == '3':
-            employees = db.get_all_employees()
-            print_employees(employees)
-        elif mode == '4':
-            print("Генерируем 1.000.000 записей и 100 записей для 5-го пункта")
-            count = db.generate_test_data(1000000, 100)
-            print_success(f"Добавлено {count} тестовых записей")
-        elif mode == '5':
-            start_time = datetime.now()
-            employees = db.query_male_f()
-            execution_time = datetime.now() - start_time
-
-            print_employees(employees)
-            print(f"\nВремя выполнения запроса: {execution_time.total_seconds():.4f} секунд")
-        elif mode == '6':
-            # Замеряем время до оптимизации
-            start_time = datetime.now()
-            db.query_male_f()
-            time_before = datetime.now() - start_time
-
-            # Выполняем оптимизацию
-            if db.optimize_database():
-                # Замеряем время после оптимизации
-                start_time = datetime.now()
-                db.query_male_f()
-                time_after = datetime.now() - start_time
-                print_success("База данных успешно оптимизирована")
-                print("\nРезультаты оптимизации:")
-                print(f"До оптимизации: {time_before.total_seconds():.4f} сек.")
-                print(f"После оптимизации: {time_after.total_seconds():.4f} сек.")
-                improvement = (time_before - time_after) / time_before * 100
-                print(f"Ускорение: {improvement:.1f}%")
-                print("\nСозданы индексы:")
-                print("- idx_gender_lastname: для поиска по полу и первой букве фамилии")
-                print("- idx_gender: для фильтрации по полу")
-                print("- idx_first_letter: для поиска по первой букве фамилии")
-        else:
-            print_error("Неверные аргументы")
-            print("Примеры:")
-            print("  app.py 1 - создать таблицу")
-            print("  app.py 2 'Ivanov Ivan' 1990-05-15 M - добавить сотрудника")
-            print("  app.py 3 - вывести всех сотрудников")
-            print("  app.py 4 - генерация 1.000.000 записей с 100 записей для 5-го пункта")
-            print("  app.py 5 - вывести всех сотрудников мужского пола и у кого ФИО начинается на букву F")
-            print("  app.py 6 - выполнить оптимизацию базы")
+        handler(db, *args[:len(prompts)])
     except RuntimeError as e:
         print_error(str(e))
 
 
 def main():
     db = EmployeeDB()
+    try:
+        run(db)
+    finally:
+        db.close()
 
+
+def run(db):
     # Проверка аргументов командной строки
     if len(sys.argv) > 1:
         handle_command(db, sys.argv[1], sys.argv[2:])
@@ -114,57 +179,18 @@ def main():
     while True:
         print_menu()
         choice = input("Выберите действие: ")
+        if choice == '0':
+            break
 
-        try:
-            if choice == '1':
-                db.create_table()
-                print_success("Таблица успешно создана")
-            elif choice == '2':
-                full_name = input("ФИО: ")
-                birth_date = input("Дата рождения (YYYY-MM-DD): ")
-                gender = input("Пол (M/F): ")
-                if db.add_employee(full_name, birth_date, gender):
-                    print_success("Сотрудник успешно добавлен")
-            elif choice == '3':
-                employees = db.get_all_employees()
-                print_employees(employees)
-            elif choice == '4':
-                count = db.generate_test_data(1000000, 100)
-                print_success(f"Добавлено {count} тестовых записей")
-            elif choice == '5':
-                start_time = datetime.now()
-                employees = db.query_male_f()
-                execution_time = datetime.now() - start_time
-
-                print_employees(employees)
-                print(f"\nВремя выполнения запроса: {execution_time.total_seconds():.4f} секунд")
-            elif choice == '6':
-                start_time = datetime.now()
-                db.query_male_f()
-                time_before = datetime.now() - start_time
-
-                if db.optimize_database():
-                    start_time = datetime.now()
-                    db.query_male_f()
-                    time_after = datetime.now() - start_time
-
-                    print_success("База данных успешно оптимизирована")
-                    print("\nРезультаты оптимизации:")
-                    print(f"До оптимизации: {time_before.total_seconds():.4f} сек.")
-                    print(f"После оптимизации: {time_after.total_seconds():.4f} сек.")
-                    improvement = (time_before - time_after) / time_before * 100
-                    print(f"Ускорение: {improvement:.1f}%")
-
-                    print("\nСозданы индексы:")
-                    print("- Составной индекс (пол + первая буква фамилии)")
-                    print("- Индекс по полу")
-                    print("- Индекс по первой букве фамилии")
-            elif choice == '0':
-                break
-            else:
-                print_error("Неверный выбор")
-        except RuntimeError as e:
-            print_error(str(e))
+        command = COMMANDS.get(choice)
+        if command is None:
+            print_error("Неверный выбор")
+        else:
+            handler, prompts = command
+            try:
+                handler(db, *[input(prompt) for prompt in prompts])
+            except RuntimeError as e:
+                print_error(str(e))
 
         input("\nНажмите Enter чтобы продолжить...")
 
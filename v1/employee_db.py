@@ -1,26 +1,97 @@
 # -*- coding: utf-8 -*-
 
 import sqlite3
-from datetime import datetime
+from datetime import date, datetime
+from itertools import chain, islice
+
+# Строк в одном многострочном INSERT: 300 * 3 параметра укладываются
+# в лимит 999 переменных старых сборок SQLite
+INSERT_CHUNK = 300
+
+# Настройки соединения: WAL вместо журнала отката, fsync только на контрольных
+# точках, кэш 64 МБ, временные таблицы и сортировки в памяти.
+# WAL работает только для файловой БД, для ':memory:' режим журнала не меняется.
+CONNECTION_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;
+    PRAGMA mmap_size=268435456;
+"""
+
+
+# Запросы горячего пути. Один и тот же объект строки при каждом вызове
+# попадает в кэш подготовленных выражений соединения
+SQL_INSERT = "INSERT INTO employees (full_name, birth_date, gender) VALUES (?, ?, ?)"
+
+SQL_GET_ALL = """
+              SELECT full_name, birth_date, gender
+              FROM employees
+              GROUP BY full_name, birth_date
+              ORDER BY full_name, birth_date
+              """
+
+SQL_QUERY_MALE_F = """
+                   SELECT full_name, birth_date, gender
+                   FROM employees
+                   WHERE gender = 'Male'
+                     AND full_name >= 'F'
+                     AND full_name < 'G'
+                   """
+
+# Варианты ввода мужского пола, всё остальное считается женским
+MALE_TOKENS = frozenset({'м', 'm', 'male', '1', 'мужской'})
+
+# Размер кэша подготовленных выражений на соединение
+CACHED_STATEMENTS = 256
+
+
+def calculate_age(birth_date, today=None):
+    """Возвращает количество полных лет на дату today (по умолчанию сегодня).
+    Для нераспознанной даты возвращает None, как прежний расчёт в SQL
+    """
+    if isinstance(birth_date, str):
+        try:
+            birth_date = date.fromisoformat(birth_date)
+        except ValueError:
+            return None
+    today = today or date.today()
+    return today.year - birth_date.year - ((today.month, today.day) < (birth_date.month, birth_date.day))
 
 
 class EmployeeDB:
     def __init__(self, db_name='employees.db'):
         self.db_name = db_name
         self.conn = None
+        self._table_ready = False
+        self._connect()
+
+    def __del__(self):
+        self.close()
 
     def _connect(self):
-        """Устанавливает соединение с БД"""
+        """Устанавливает соединение с БД (одно на весь срок жизни объекта)"""
+        if self.conn is not None:
+            return
         try:
-            self.conn = sqlite3.connect(self.db_name)
+            # isolation_level=None: транзакции открываются явно через BEGIN
+            self.conn = sqlite3.connect(
+                self.db_name,
+                check_same_thread=False,
+                cached_statements=CACHED_STATEMENTS,
+                isolation_level=None
+            )
+            self.conn.executescript(CONNECTION_PRAGMAS)
             self.conn.row_factory = sqlite3.Row
         except sqlite3.Error as e:
             raise RuntimeError(f"Ошибка подключения к базе: {str(e)}")
 
-    def _close(self):
+    def close(self):
         """Закрывает соединение с БД"""
         if self.conn:
             try:
+                # Обновляет статистику планировщика, если она устарела
+                self.conn.execute("PRAGMA optimize")
                 self.conn.close()
             except sqlite3.Error:
                 pass
@@ -28,17 +99,10 @@ class EmployeeDB:
                 self.conn = None
 
     def _ensure_table_exists(self):
-        """Гарантирует что таблица существует"""
-        try:
-            self._connect()
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='employees'")
-            if not cursor.fetchone():
-                self.create_table()
-        except sqlite3.Error as e:
-            raise RuntimeError(f"Ошибка проверки таблицы: {str(e)}")
-        finally:
-            self._close()
+        """Гарантирует что таблица существует (DDL выполняется один раз за сессию)"""
+        self._connect()
+        if not self._table_ready:
+            self.create_table()
 
     def create_table(self):
         """Создает таблицу сотрудников"""
@@ -55,28 +119,14 @@ class EmployeeDB:
                            )
                            """)
             self.conn.commit()
+            self._table_ready = True
         except sqlite3.Error as e:
             raise RuntimeError(f"Ошибка создания таблицы: {str(e)}")
-        finally:
-            self._close()
 
     def add_employee(self, full_name, birth_date, gender):
         """Добавляет нового сотрудника"""
         try:
-            # Проверка формата даты
-            datetime.strptime(birth_date, '%Y-%m-%d')
-
-            # Нормализация данных
-            gender = 'Male' if gender.lower() in ('м', 'm', 'male', '1') else 'Female'
-
-            self._ensure_table_exists()
-            self._connect()
-            cursor = self.conn.cursor()
-            cursor.execute(
-                "INSERT INTO employees (full_name, birth_date, gender) VALUES (?, ?, ?)",
-                (full_name, birth_date, gender)
-            )
-            self.conn.commit()
+            self.bulk_add_employees([(full_name, birth_date, gender)])
             return True
         except ValueError:
             print("Ошибка: Неверный формат даты. Используйте YYYY-MM-DD")
@@ -84,65 +134,130 @@ class EmployeeDB:
         except Exception as e:
             print(f"Ошибка при добавлении сотрудника: {e}")
             return False
-        finally:
-            self._close()
 
-    def get_all_employees(self):
-        """Возвращает всех сотрудников"""
+    def bulk_add_employees(self, rows):
+        """Добавляет сотрудников пакетом в одной транзакции
+
+        rows - итерируемое кортежей (ФИО, дата рождения YYYY-MM-DD, пол).
+        Все строки проверяются до обращения к БД, при неверной дате
+        выбрасывается ValueError и ничего не записывается.
+        """
+        normalized = []
+        for full_name, birth_date, gender in rows:
+            # Проверка формата даты; в БД сохраняется каноничная форма YYYY-MM-DD
+            birth_date = datetime.strptime(birth_date, '%Y-%m-%d').date().isoformat()
+
+            # Нормализация данных
+            gender = 'Male' if gender.lower() in MALE_TOKENS else 'Female'
+            normalized.append((full_name, birth_date, gender))
+
         try:
             self._ensure_table_exists()
-            self._connect()
             cursor = self.conn.cursor()
-            cursor.execute("""
-                           SELECT full_name,
-                                  birth_date,
-                                  gender,
-                                  (strftime('%Y', 'now') - strftime('%Y', birth_date)) -
-                                  (strftime('%m-%d', 'now') < strftime('%m-%d', birth_date)) as age
-                           FROM employees
-                           GROUP BY full_name, birth_date
-                           ORDER BY full_name
-                           """)
-            return cursor.fetchall()
+            self.conn.execute("BEGIN")
+            cursor.executemany(SQL_INSERT, normalized)
+            self.conn.commit()
+            return len(normalized)
         except sqlite3.Error as e:
-            raise RuntimeError(f"Ошибка получения сотрудников: {str(e)}")
-        finally:
-            self._close()
-
-    def generate_test_data(self, count=1000000, special=100):
-        """Генерирует тестовые данные"""
-        from random import choice, randint
-        from datetime import date, timedelta
+            self.conn.rollback()
+            raise RuntimeError(f"Ошибка пакетного добавления сотрудников: {str(e)}")
 
+    def get_all_employees(self):
+        """Возвращает итератор по всем сотрудникам (строки читаются по мере обхода)"""
         try:
             self._ensure_table_exists()
             self._connect()
             cursor = self.conn.cursor()
+            cursor.execute(SQL_GET_ALL)
+            yield from cursor
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Ошибка получения сотрудников: {str(e)}")
+
+    def generate_test_data(self, count=1000000, special=100, reindex_after=True):
+        """Генерирует тестовые данные
+
+        При reindex_after=True существующие индексы удаляются перед загрузкой
+        и пересоздаются после неё: построить индекс один раз дешевле,
+        чем обновлять его на каждой вставке.
+        """
+        from random import choices
+        from datetime import timedelta
+
+        def rows(block=100000):
+            today = date.today()
+
+            # Справочники значений строятся один раз, дальше строки собираются
+            # выборкой random.choices() блоками, без вызовов на каждую строку
+            genders = ('Male', 'Female')
+            first_names = [f"Name{i}" for i in range(1, 1001)]
+            last_names = [f"Lastname{i}" for i in range(1, 1001)]
+            birth_dates = [
+                (today - timedelta(days=days)).isoformat()
+                for days in range(18 * 365, 65 * 365 + 1)
+            ]
 
             # Основные данные
-            for i in range(count):
-                gender = choice(['Male', 'Female'])
-                first_name = f"Name{randint(1, 1000)}"
-                last_name = f"Lastname{randint(1, 1000)}"
-                birth_date = date.today() - timedelta(days=randint(18 * 365, 65 * 365))
-
-                cursor.execute(
-                    "INSERT INTO employees (full_name, birth_date, gender) VALUES (?, ?, ?)",
-                    (f"{last_name} {first_name}", birth_date.isoformat(), gender)
+            for start in range(0, count, block):
+                size = min(block, count - start)
+                yield from zip(
+                    map("{} {}".format, choices(last_names, k=size), choices(first_names, k=size)),
+                    choices(birth_dates, k=size),
+                    choices(genders, k=size)
                 )
 
             # Специальные записи
-            for i in range(special):
-                birth_date = date.today() - timedelta(days=randint(18 * 365, 65 * 365))
-                cursor.execute(
-                    "INSERT INTO employees (full_name, birth_date, gender) VALUES (?, ?, ?)",
-                    (f"Fake_{i} Surname", birth_date.isoformat(), 'Male')
-                )
+            for i, birth_date in enumerate(choices(birth_dates, k=special)):
+                yield f"Fake_{i} Surname", birth_date, 'Male'
 
+        try:
+            self._ensure_table_exists()
+            self._connect()
+            cursor = self.conn.cursor()
+
+            indexes = []
+            if reindex_after:
+                cursor.execute("""
+                               SELECT name, sql
+                               FROM sqlite_master
+                               WHERE type = 'index'
+                                 AND tbl_name = 'employees'
+                                 AND sql IS NOT NULL
+                               """)
+                indexes = cursor.fetchall()
+
+            # Вся загрузка одной транзакцией: один fsync вместо миллиона
+            self.conn.execute("BEGIN")
+            for index in indexes:
+                cursor.execute(f'DROP INDEX "{index["name"]}"')
+            self._insert_chunked(cursor, rows())
+            for index in indexes:
+                cursor.execute(index['sql'])
             self.conn.commit()
+
+            # Статистика для планировщика до первого запроса по новым данным
+            cursor.execute("ANALYZE employees")
             return count + special
-        finally:
-            self._close()
+        except sqlite3.Error as e:
+            self.conn.rollback()
+            raise RuntimeError(f"Ошибка генерации тестовых данных: {str(e)}")
+
+    @staticmethod
+    def _insert_chunked(cursor, rows):
+        """Вставляет строки пачками по INSERT_CHUNK через многострочный VALUES"""
+        statements = {}
+        it = iter(rows)
+        while True:
+            chunk = list(islice(it, INSERT_CHUNK))
+            if not chunk:
+                break
+            size = len(chunk)
+            sql = statements.get(size)
+            if sql is None:
+                placeholders = ", ".join(["(?, ?, ?)"] * size)
+                sql = statements[size] = (
+                    f"INSERT INTO employees (full_name, birth_date, gender) VALUES {placeholders}"
+                )
+            cursor.execute(sql, list(chain.from_iterable(chunk)))
 
     def query_male_f(self):
         """Запрос мужчин с фамилией на F"""
@@ -150,19 +265,10 @@ class EmployeeDB:
             self._ensure_table_exists()
             self._connect()
             cursor = self.conn.cursor()
-            cursor.execute("""
-                           SELECT full_name,
-                                  birth_date,
-                                  gender,
-                                  (strftime('%Y', 'now') - strftime('%Y', birth_date)) -
-                                  (strftime('%m-%d', 'now') < strftime('%m-%d', birth_date)) as age
-                           FROM employees
-                           WHERE gender = 'Male'
-                             AND full_name LIKE 'F%'
-                           """)
+            cursor.execute(SQL_QUERY_MALE_F)
             return cursor.fetchall()
-        finally:
-            self._close()
+        except sqlite3.Error as e:
+            raise RuntimeError(f"Ошибка запроса: {str(e)}")
 
     def optimize_database(self):
         """Создает индексы для ускорения запросов"""
@@ -170,27 +276,30 @@ class EmployeeDB:
             self._connect()
             cursor = self.conn.cursor()
 
-            # Создаем составной индекс для часто используемого запроса
-            cursor.execute("""
-                           CREATE INDEX IF NOT EXISTS idx_gender_lastname
-                               ON employees(gender, substr(full_name, 1, 1))
-                           """)
+            # Индексы по substr() не применимы к условию по префиксу ФИО,
+            # остальные являются префиксами покрывающего индекса
+            for index in ('idx_gender_lastname', 'idx_first_letter', 'idx_gender', 'idx_gender_fullname'):
+                cursor.execute(f"DROP INDEX IF EXISTS {index}")
 
-            # Оптимизация для поиска по полу
+            # Покрывающий индекс: равенство по полу + диапазон по префиксу ФИО,
+            # дата рождения читается из индекса без обращения к таблице
             cursor.execute("""
-                           CREATE INDEX IF NOT EXISTS idx_gender
-                               ON employees(gender)
+                           CREATE INDEX IF NOT EXISTS idx_gender_fullname_bd
+                               ON employees(gender, full_name COLLATE BINARY, birth_date)
                            """)
 
-            # Оптимизация для поиска по первой букве фамилии
+            # Покрывающий индекс в порядке группировки и сортировки списка
+            # сотрудников: уникальные ФИО+дата читаются без временных B-деревьев
             cursor.execute("""
-                           CREATE INDEX IF NOT EXISTS idx_first_letter
-                               ON employees(substr(full_name, 1, 1))
+                           CREATE INDEX IF NOT EXISTS idx_fullname_bd
+                               ON employees(full_name, birth_date, gender)
                            """)
 
             self.conn.commit()
+
+            # Без статистики планировщик не знает селективность индексов
+            cursor.execute("ANALYZE employees")
+            cursor.execute("PRAGMA optimize")
             return True
         except sqlite3.Error as e:
             raise RuntimeError(f"Ошибка оптимизации БД: {str(e)}")
-        finally:
-            self._close()
@@ -13,6 +13,65 @@ init(autoreset=True)
 logger = get_module_logger(__name__)
 
 
+def run_interactive(manager, cli, args):
+    cli.interactive_mode()
+
+
+def create_table(manager, cli, args):
+    manager.ensure_table_exists()
+    print(Fore.GREEN + "Таблица сотрудников создана/проверена")
+
+
+def add_employee(manager, cli, args):
+    manager.add_employee(
+        full_name=args[0],
+        birth_date=args[1],
+        gender_input=args[2]
+    )
+    print(Fore.GREEN + "Сотрудник успешно добавлен")
+
+
+def list_employees(manager, cli, args):
+    employees = manager.get_all_employees()
+    cli.display_employees(employees)
+
+
+def generate_test_data(manager, cli, args):
+    result = manager.generate_test_data()
+    print(Fore.GREEN + f"Сгенерировано {result['total']} записей ({result['special']} спецзаписей)")
+
+
+def query_male_f(manager, cli, args):
+    employees, time = manager.get_male_employees_with_f_surname()
+    cli.display_employees(employees)
+    print(Fore.YELLOW + f"\nЗапрос выполнен за {time:.4f} сек.")
+
+
+def optimize_db(manager, cli, args):
+    cli._optimize_db()
+
+
+def search_employees(manager, cli, args):
+    gender = 'Male' if args[0] in ('1', 'M', 'Male') else 'Female'
+    name_part = args[1]
+    employees, exec_time = manager.search_employees(gender, name_part)
+    cli.display_employees(employees)
+    print(f"\nЗапрос выполнен за {exec_time:.4f} сек.")
+
+
+# Режим -> (обработчик, минимальное количество аргументов)
+MODES = {
+    0: (run_interactive, 0),
+    1: (create_table, 0),
+    2: (add_employee, 3),
+    3: (list_employees, 0),
+    4: (generate_test_data, 0),
+    5: (query_male_f, 0),
+    6: (optimize_db, 0),
+    7: (search_employees, 2),
+}
+
+
 def main():
     # Настройка парсера аргументов
     parser = argparse.ArgumentParser(
@@ -38,44 +97,19 @@ def main():
 
     try:
         args = parser.parse_args()
-        manager = EmployeeManager()
-        cli = EmployeeCLI(manager)
 
         # Обработка режимов
-        if args.mode is None or args.mode == 0:
-            cli.interactive_mode()
-        elif args.mode == 1:
-            manager.ensure_table_exists()
-            print(Fore.GREEN + "Таблица сотрудников создана/проверена")
-        elif args.mode == 2 and len(args.args) >= 3:
-            manager.add_employee(
-                full_name=args.args[0],
-                birth_date=args.args[1],
-                gender_input=args.args[2]
-            )
-            print(Fore.GREEN + "Сотрудник успешно добавлен")
-        elif args.mode == 3:
-            employees = manager.get_all_employees()
-            cli.display_employees(employees)
-        elif args.mode == 4:
-            result = manager.generate_test_data()
-            print(Fore.GREEN + f"Сгенерировано {result['total']} записей ({result['special']} спецзаписей)")
-        elif args.mode == 5:
-            employees, time = manager.get_male_employees_with_f_surname()
-            cli.display_employees(employees)
-            print(Fore.YELLOW + f"\nЗапрос выполнен за {time:.4f} сек.")
-        elif args.mode == '6':
-            cli._optimize_and_show_results()
-            print(Fore.GREEN + "База данных оптимизирована")
-        elif args.mode == '7' and len(args.args) >= 2:
-            gender = 'Male' if args[0] in ('1', 'M', 'Male') else 'Female'
-            name_part = args[1]
-            employees, exec_time = manager.search_employees(gender, name_part)
-            cli.display_employees(employees)
-            print(f"\nЗапрос выполнен за {exec_time:.4f} сек.")
-        else:
+        command = MODES.get(args.mode or 0)
+        if command is None or len(args.args) < command[1]:
             print(Fore.RED + "Неверные аргументы или режим")
             parser.print_help()
+            return
+
+        # Одно соединение с БД на всё время работы приложения
+        with EmployeeManager() as manager:
+            cli = EmployeeCLI(manager)
+            handler, _ = command
+            handler(manager, cli, args.args)
 
     except Exception as e:
         error_message = f"Ошибка: {str(e)}"
@@ -1,16 +1,54 @@
 # -*- coding: utf-8 -*-
 
-from datetime import datetime
-from typing import List
+import sys
+from datetime import date, datetime
+from itertools import chain, islice
+from typing import Iterable
 
 from colorama import init, Fore, Style
 
 from core.manager import EmployeeManager
-from database.models import Employee
+from database.models import Employee, compute_ages
 from core.logging import get_module_logger
 
 init(autoreset=True)
 
+# Статичные части интерфейса собираются один раз при импорте
+MENU = "\n".join(line + Style.RESET_ALL for line in (
+    Fore.BLUE + "\n" + "=" * 50,
+    Fore.GREEN + "СИСТЕМА УПРАВЛЕНИЯ СОТРУДНИКАМИ".center(50),
+    Fore.BLUE + "=" * 50,
+    f"{Fore.YELLOW}1{Style.RESET_ALL} - Создать/проверить таблицу",
+    f"{Fore.YELLOW}2{Style.RESET_ALL} - Добавить сотрудника",
+    f"{Fore.YELLOW}3{Style.RESET_ALL} - Список всех сотрудников",
+    f"{Fore.YELLOW}4{Style.RESET_ALL} - Генерация тестовых данных",
+    f"{Fore.YELLOW}5{Style.RESET_ALL} - Запрос: мужчины на 'F'",
+    f"{Fore.YELLOW}6{Style.RESET_ALL} - Оптимизировать БД",
+    f"{Fore.YELLOW}7{Style.RESET_ALL} - Универсальный поиск",
+    f"{Fore.RED}0{Style.RESET_ALL} - Выход",
+    Fore.BLUE + "=" * 50,
+))
+
+TABLE_HEADER = "\n".join(line + Style.RESET_ALL for line in (
+    Fore.BLUE + "\n" + "=" * 70,
+    Fore.GREEN + "СПИСОК СОТРУДНИКОВ".center(70),
+    Fore.BLUE + "=" * 70,
+    f"{Fore.YELLOW}ФИО{' ' * 30}Дата рождения{' ' * 4}Пол{' ' * 4}Возраст",
+    Fore.BLUE + "-" * 70,
+))
+
+TABLE_FOOTER = Fore.BLUE + "=" * 70
+
+# ФИО, дата рождения, пол, возраст
+ROW_FMT = "{:35} {}   {:6} {:3} лет"
+
+# Количество строк таблицы, выводимых одним вызовом write
+PRINT_BATCH = 4096
+
+# Допустимый ввод пола (после upper())
+MALE_INPUTS = frozenset({'1', 'М', 'M'})
+FEMALE_INPUTS = frozenset({'2', 'Ж', 'F'})
+
 
 class EmployeeCLI:
     """Класс для взаимодействия через командную строку"""
@@ -18,6 +56,15 @@ class EmployeeCLI:
     def __init__(self, manager: EmployeeManager):
         self.logger = get_module_logger(__name__)
         self.manager = manager
+        self._actions = {
+            '1': self._create_table,
+            '2': self._add_employee_interactive,
+            '3': self._list_employees,
+            '4': self._generate_test_data,
+            '5': self._query_male_f,
+            '6': self._optimize_db,
+            '7': self._search_by_criteria,
+        }
 
     def interactive_mode(self):
         """Основной интерактивный режим"""
@@ -27,20 +74,9 @@ class EmployeeCLI:
             choice = input(Fore.CYAN + "Выберите действие: " + Style.RESET_ALL)
 
             try:
-                if choice == '1':
-                    self._create_table()
-                elif choice == '2':
-                    self._add_employee_interactive()
-                elif choice == '3':
-                    self._list_employees()
-                elif choice == '4':
-                    self._generate_test_data()
-                elif choice == '5':
-                    self._query_male_f()
-                elif choice == '6':
-                    self._optimize_db()
-                elif choice == '7':
-                    self._search_by_criteria()
+                action = self._actions.get(choice)
+                if action is not None:
+                    action()
                 elif choice == '0':
                     logger_message = "Выход из программы..."
                     self.logger.info(logger_message)
@@ -59,18 +95,7 @@ class EmployeeCLI:
 
     def _print_menu(self):
         """Выводит главное меню"""
-        print(Fore.BLUE + "\n" + "=" * 50)
-        print(Fore.GREEN + "СИСТЕМА УПРАВЛЕНИЯ СОТРУДНИКАМИ".center(50))
-        print(Fore.BLUE + "=" * 50)
-        print(f"{Fore.YELLOW}1{Style.RESET_ALL} - Создать/проверить таблицу")
-        print(f"{Fore.YELLOW}2{Style.RESET_ALL} - Добавить сотрудника")
-        print(f"{Fore.YELLOW}3{Style.RESET_ALL} - Список всех сотрудников")
-        print(f"{Fore.YELLOW}4{Style.RESET_ALL} - Генерация тестовых данных")
-        print(f"{Fore.YELLOW}5{Style.RESET_ALL} - Запрос: мужчины на 'F'")
-        print(f"{Fore.YELLOW}6{Style.RESET_ALL} - Оптимизировать БД")
-        print(f"{Fore.YELLOW}7{Style.RESET_ALL} - Универсальный поиск")
-        print(f"{Fore.RED}0{Style.RESET_ALL} - Выход")
-        print(Fore.BLUE + "=" * 50)
+        print(MENU)
 
     def _create_table(self):
         """Создание таблицы"""
@@ -93,10 +118,10 @@ class EmployeeCLI:
 
         while True:
             gender = input("Пол (1-М/2-Ж или M/F): ").upper()
-            if gender in ['1', 'М', 'M']:
+            if gender in MALE_INPUTS:
                 gender = 'M'
                 break
-            elif gender in ['2', 'Ж', 'F']:
+            elif gender in FEMALE_INPUTS:
                 gender = 'F'
                 break
             else:
@@ -110,29 +135,37 @@ class EmployeeCLI:
         employees = self.manager.get_all_employees()
         self.display_employees(employees)
 
-    def display_employees(self, employees: List[Employee]):
-        """Форматированный вывод списка сотрудников"""
-        if not employees:
+    def display_employees(self, employees: Iterable[Employee]):
+        """Форматированный вывод списка сотрудников (список или итератор)"""
+        employees = iter(employees)
+        first = next(employees, None)
+        if first is None:
             print(Fore.YELLOW + "Нет данных о сотрудниках")
             return
 
-        print(Fore.BLUE + "\n" + "=" * 70)
-        print(Fore.GREEN + "СПИСОК СОТРУДНИКОВ".center(70))
-        print(Fore.BLUE + "=" * 70)
-        print(f"{Fore.YELLOW}ФИО{' ' * 30}Дата рождения{' ' * 4}Пол{' ' * 4}Возраст")
-        print(Fore.BLUE + "-" * 70)
-
-        for emp in employees:
-            age = emp.calculate_age()
-            print(
-                f"{emp.full_name:35} "
-                f"{emp.birth_date}   "
-                f"{emp.gender:6} "
-                f"{age:3} лет"
-            )
+        print(TABLE_HEADER)
+
+        # Строки выводятся пачками: один write (и один сброс цвета colorama)
+        # на PRINT_BATCH строк вместо print на каждую
+        format_row = ROW_FMT.format
+        write = sys.stdout.write
+        rows = chain((first,), employees)
+        today = date.today()
+        count = 0
+        while True:
+            batch = list(islice(rows, PRINT_BATCH))
+            if not batch:
+                break
+            ages = compute_ages([emp.birth_date for emp in batch], today)
+            buf = [
+                format_row(emp.full_name, str(emp.birth_date), emp.gender, age)
+                for emp, age in zip(batch, ages)
+            ]
+            count += len(buf)
+            write("\n".join(buf) + "\n")
 
-        print(Fore.BLUE + "=" * 70)
-        print(Fore.GREEN + f"Всего: {len(employees)} сотрудников")
+        print(TABLE_FOOTER)
+        print(Fore.GREEN + f"Всего: {count} сотрудников")
 
     def _generate_test_data(self):
         """Генерация тестовых данных"""
@@ -157,16 +190,12 @@ class EmployeeCLI:
         print(Fore.GREEN + "База данных успешно оптимизирована")
         print("\nРезультаты оптимизации:")
 
-        # Преобразуем timedelta в секунды с плавающей точкой
-        before_sec = result['before'].total_seconds()
-        after_sec = result['after'].total_seconds()
-
-        print(f"До оптимизации: {before_sec:.4f} сек.")
-        print(f"После оптимизации: {after_sec:.4f} сек.")
+        print(f"До оптимизации: {result['before']:.4f} сек.")
+        print(f"После оптимизации: {result['after']:.4f} сек.")
         print(f"Ускорение: {result['improvement']:.1f}%")
 
         print("\nСозданы индексы:")
-        print("- idx_gender_fname: для поиска по полу и первой букве фамилии")
+        print("- idx_gender_name: для поиска по полу и началу фамилии")
         print("- idx_full_name: для поиска по ФИО")
         print("- idx_birth_date: для поиска по дате рождения")
 
@@ -1,5 +1,13 @@
 # -*- coding: utf-8 -*-
 
-from .config import settings
+from .config import get_settings
 
-__all__ = ['settings']
+
+def __getattr__(name: str):
+    # Обратная совместимость с `from core import settings`
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ['get_settings', 'settings']
@@ -1,16 +1,13 @@
 # -*- coding: utf-8 -*-
 
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from pathlib import Path
+from typing import Mapping, Optional
 
 from dotenv import load_dotenv
 
-# === Предупреждение, если .env отсутствует ===
-if not os.path.exists(".env"):
-    print("⚠️  WARNING: .env файл не найден! Используются переменные окружения или значения по умолчанию.")
-
-load_dotenv()
-
 
 def parse_bool(val: str, default=False) -> bool:
     if val is None:
@@ -18,46 +15,74 @@ def parse_bool(val: str, default=False) -> bool:
     return val.strip().lower() in ("1", "true", "yes", "on")
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Settings:
     # Database
-    DB_TYPE: str = os.getenv("DB_TYPE", "sqlite")
+    DB_TYPE: str = "sqlite"
 
     # # PostgreSQL
-    # DB_HOST: str = os.getenv("DB_HOST", "postgres")
-    # DB_PORT: int = int(os.getenv("DB_PORT", "5432"))
-    DB_NAME: str = os.getenv("DB_NAME", "employees.db")
-    # DB_USER: str = os.getenv("DB_USER", "postgres")
-    # DB_PASSWORD: str = os.getenv("DB_PASSWORD", "postgres")
-    # DB_SCHEMA: str = os.getenv("DB_SCHEMA", "public")
-    # DB_RECONNECT_ATTEMPTS: int = int(os.getenv("DB_RECONNECT_ATTEMPTS", 10))
-    # DB_RECONNECT_DELAY: int = int(os.getenv("DB_RECONNECT_DELAY", 3))
-    # DB_CONNECT_TIMEOUT: int = int(os.getenv("DB_CONNECT_TIMEOUT", 5))
-    # DB_SSL_REQUIRE: bool = parse_bool(os.getenv("DB_SSL_REQUIRE"), True)
-    # DB_SSLROOTCERT: str = os.getenv("DB_SSLROOTCERT", "")
-    # DB_MINTHREAD: int = int(os.getenv("DB_MINTHREAD", 2))
-    # DB_MAXTHREAD: int = int(os.getenv("DB_MAXTHREAD", 4))
-    # DB_MAXCONN_TOTAL: int = int(os.getenv("DB_MAXCONN_TOTAL", 50))
-    # DB_MONITOR_INTERVAL: int = int(os.getenv("DB_MONITOR_INTERVAL", 300))
+    # DB_HOST: str = "postgres"
+    # DB_PORT: int = 5432
+    DB_NAME: str = "employees.db"
+    # DB_USER: str = "postgres"
+    # DB_PASSWORD: str = "postgres"
+    # DB_SCHEMA: str = "public"
+    # DB_RECONNECT_ATTEMPTS: int = 10
+    # DB_RECONNECT_DELAY: int = 3
+    # DB_CONNECT_TIMEOUT: int = 5
+    # DB_SSL_REQUIRE: bool = True
+    # DB_SSLROOTCERT: str = ""
+    # DB_MINTHREAD: int = 2
+    # DB_MAXTHREAD: int = 4
+    # DB_MAXCONN_TOTAL: int = 50
+    # DB_MONITOR_INTERVAL: int = 300
     #
     # # Кеш
-    # CACHE_TIMEOUT: int = int(os.getenv("CACHE_TIMEOUT", 300))
+    # CACHE_TIMEOUT: int = 300
+
+    # SQLite (WAL требует файловую БД, для ':memory:' игнорируется)
+    DB_JOURNAL_MODE: str = "WAL"
+    DB_SYNCHRONOUS: str = "NORMAL"
+    DB_CACHE_KB: int = 65536
+    DB_MMAP_BYTES: int = 268435456
 
     # Логирование
-    LOG_DIR: str = os.getenv("LOG_DIR", "logs")
-    LOG_FILE: str = os.getenv("LOG_FILE", "app.log")
-    LOG_LEVEL_FILE: str = os.getenv("LOG_LEVEL_FILE", "INFO")
-    LOG_TO_JSON: bool = parse_bool(os.getenv("LOG_TO_JSON"), False)
-    LOG_JSON_FILE: str = os.getenv("LOG_JSON_FILE", "app.json")
-    LOG_TO_CONSOLE: bool = parse_bool(os.getenv("LOG_TO_CONSOLE"), True)
-    LOG_LEVEL_CONSOLE: str = os.getenv("LOG_LEVEL_CONSOLE", "INFO")
-    LOG_ASYNC_LOGGING: bool = parse_bool(os.getenv("LOG_ASYNC_LOGGING"), True)
-    LOG_CAPTURE_EXCEPTIONS: bool = parse_bool(os.getenv("LOG_CAPTURE_EXCEPTIONS"), True)
-    LOG_ROTATION: str = os.getenv("LOG_ROTATION", "10 MB")
-    LOG_RETENTION: str = os.getenv("LOG_RETENTION", "30 days")
+    LOG_DIR: str = "logs"
+    LOG_FILE: str = "app.log"
+    LOG_LEVEL_FILE: str = "INFO"
+    LOG_TO_JSON: bool = False
+    LOG_JSON_FILE: str = "app.json"
+    LOG_TO_CONSOLE: bool = True
+    LOG_LEVEL_CONSOLE: str = "INFO"
+    LOG_ASYNC_LOGGING: bool = True
+    LOG_CAPTURE_EXCEPTIONS: bool = True
+    LOG_ROTATION: str = "10 MB"
+    LOG_RETENTION: str = "30 days"
 
     # Отладка
-    DEBUG_MODE: bool = parse_bool(os.getenv("DEBUG_MODE"), False)
+    DEBUG_MODE: bool = False
+
+    @classmethod
+    def from_env(cls, env: Optional[Mapping[str, str]] = None) -> "Settings":
+        """
+        Создаёт настройки из переменных окружения.
+        Значения приводятся к типам полей один раз, при создании экземпляра.
+
+        :param env: Источник переменных (по умолчанию os.environ)
+        """
+        env = os.environ if env is None else env
+        parsed = {}
+        for f in fields(cls):
+            raw = env.get(f.name)
+            if raw is None:
+                continue
+            if f.type is bool:
+                parsed[f.name] = parse_bool(raw, f.default)
+            elif f.type is int:
+                parsed[f.name] = int(raw)
+            else:
+                parsed[f.name] = raw
+        return cls(**parsed)
 
     # @property
     # def DB_URL(self) -> str:
@@ -77,5 +102,24 @@ class Settings:
     #         raise ValueError(f"Config validation errors: {errors}")
 
 
-settings = Settings()
-# settings.validate()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Возвращает настройки приложения. При первом вызове загружает .env
+    и создаёт экземпляр Settings, дальше отдаёт его же.
+    """
+    # === Предупреждение, если .env отсутствует ===
+    if not Path(".env").is_file():
+        print("⚠️  WARNING: .env файл не найден! Используются переменные окружения или значения по умолчанию.")
+
+    load_dotenv()
+    settings = Settings.from_env()
+    # settings.validate()
+    return settings
+
+
+def __getattr__(name: str):
+    # Обратная совместимость с `from core.config import settings`
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -13,11 +13,15 @@ set_log_level("DEBUG")  # Установить уровень логирован
 import sys
 import re
 import os
+import queue
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 
 from loguru import logger
-from core.config import settings
+from core.config import get_settings
 
 
 class LoggingSetupError(Exception):
@@ -48,19 +52,114 @@ def ensure_log_dir(path: str | Path) -> bool:
         return False
 
 
+@lru_cache(maxsize=1)
 def _get_default_log_dir() -> Path:
     """
-    Определяет директорию логов.
+    Определяет директорию логов. Результат кэшируется: проверка директории
+    выполняется один раз, а не при каждой перенастройке логгера.
 
     Returns:
         Path: Путь к директории логов.
     """
+    settings = get_settings()
     log_dir = Path(settings.LOG_DIR).expanduser().resolve() if settings.LOG_DIR else Path.cwd() / "logs"
     if ensure_log_dir(log_dir):
         return log_dir
     raise LoggingSetupError(f"Директория логов недоступна: {log_dir}")
 
 
+def _reset_log_dir_cache() -> None:
+    """Сбрасывает кэш директории логов (например, после смены LOG_DIR в тестах)."""
+    _get_default_log_dir.cache_clear()
+
+
+# Ограничение очереди файловых приёмников
+LOG_QUEUE_MAXSIZE = 10000
+# Пачка пишется в файл, когда накопилось 64 КиБ или прошло 0.5 с с первой строки пачки
+LOG_FLUSH_BYTES = 65536
+LOG_FLUSH_INTERVAL = 0.5
+
+# Ключ extra, которым помечаются пачки, уже прошедшие через очередь
+_TARGET_KEY = "log_target"
+
+
+class _QueueSink:
+    """
+    Приёмник с ограниченной очередью: вызывающий поток только кладёт готовую строку
+    в очередь, фоновый поток копит их до LOG_FLUSH_BYTES или LOG_FLUSH_INTERVAL
+    и пишет пачку одной записью в файловый приёмник Loguru
+    (ротация, хранение и сжатие остаются за ним).
+    При заполнении очереди запись блокируется, поэтому память не растёт без предела.
+    """
+
+    def __init__(self, target: str, level: str):
+        """
+        Args:
+            target: Имя файлового приёмника, в который пишутся пачки.
+            level: Уровень, с которым пачки передаются файловому приёмнику.
+        """
+        self._queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+        self._level = level
+        self._emit = logger.bind(**{_TARGET_KEY: target}).opt(raw=True).log
+        self._thread = threading.Thread(target=self._drain, name=f"log-{target}", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        self._queue.put(str(message))
+
+    def stop(self) -> None:
+        """Дописывает остаток очереди и останавливает фоновый поток."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()
+            batch = []
+            size = 0
+            deadline = time.monotonic() + LOG_FLUSH_INTERVAL
+            while item is not None:
+                batch.append(item)
+                size += len(item)
+                timeout = deadline - time.monotonic()
+                if size >= LOG_FLUSH_BYTES or timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            if batch:
+                self._emit(self._level, "".join(batch))
+            if item is None:
+                return
+
+
+def _queued_sinks(sink_config: Dict, target: str) -> List[Dict]:
+    """
+    Разбивает файловый приёмник на очередь и сам файл.
+
+    Args:
+        sink_config: Параметры файлового приёмника для logger.add.
+        target: Имя приёмника, по которому файл узнаёт свои пачки.
+
+    Returns:
+        List[Dict]: Параметры приёмника-очереди и файлового приёмника (в порядке добавления).
+    """
+    file_options = ("sink", "rotation", "retention", "compression", "encoding")
+    queue_config = {k: v for k, v in sink_config.items() if k not in file_options}
+    queue_config.update(sink=_QueueSink(target, sink_config["level"]), colorize=False, enqueue=False)
+    file_config = {k: sink_config[k] for k in file_options if k in sink_config}
+    file_config.update(
+        level=sink_config["level"],
+        filter=lambda record: record["extra"].get(_TARGET_KEY) == target,
+    )
+    return [queue_config, file_config]
+
+
+# Все шаблоны чувствительных данных в одном выражении: сообщение просматривается за один проход
+_SENSITIVE_RE = re.compile(r"password\s*=\s*\S+|token\s*=\s*\S+|\b\d{16}\b")
+
+
 def _sensitive_filter(record: Dict) -> bool:
     """
     Фильтрует чувствительные данные.
@@ -69,20 +168,22 @@ def _sensitive_filter(record: Dict) -> bool:
         record: Запись лога.
 
     Returns:
-        bool: True, чтобы пропустить запись.
-    """
-    sensitive_patterns = [
-        r"password\s*=\s*\S+",
-        r"token\s*=\s*\S+",
-        r"\b\d{16}\b"
-    ]
-    message = record["message"]
-    for pattern in sensitive_patterns:
-        message = re.sub(pattern, "****", message)
-    record["message"] = message
+        bool: True, чтобы пропустить запись (False для пачек из очереди).
+    """
+    # Пачки из очереди уже отфильтрованы и предназначены только своему файлу
+    if _TARGET_KEY in record["extra"]:
+        return False
+    record["message"] = _SENSITIVE_RE.sub("****", record["message"])
     return True
 
 
+def _log_excepthook(exc_type, exc_value, exc_traceback) -> None:
+    """Пишет необработанное исключение в лог."""
+    logger.bind(module="excepthook").opt(exception=(exc_type, exc_value, exc_traceback)).error(
+        "Необработанное исключение"
+    )
+
+
 def _setup_logger() -> None:
     """
     Настраивает логгер с тремя приёмниками: консоль, файл и JSON.
@@ -91,6 +192,7 @@ def _setup_logger() -> None:
         LoggingSetupError: Если настройка не удалась.
     """
     global _logger_initialized
+    settings = get_settings()
     if _logger_initialized:
         logger.debug(f"Пропуск повторной инициализации логгера (PID: {os.getpid()})")
         return
@@ -100,12 +202,11 @@ def _setup_logger() -> None:
         log_file = log_dir / Path(settings.LOG_FILE).name
         json_log_file = log_dir / Path(settings.LOG_JSON_FILE).name
 
-        if not ensure_log_dir(log_file.parent):
-            logger.error(f"Директория {log_file.parent} недоступна, отключаем файловое логирование.")
-            settings.LOG_LEVEL_FILE = False
-        if not ensure_log_dir(json_log_file.parent):
-            logger.error(f"Директория {json_log_file.parent} недоступна, отключаем JSON логирование.")
-            settings.LOG_TO_JSON = False
+        level_file = _log_level or settings.LOG_LEVEL_FILE
+        level_console = _log_level or settings.LOG_LEVEL_CONSOLE
+        # Оба файла лежат в log_dir, доступность которой уже проверена в _get_default_log_dir
+        file_enabled = True
+        json_enabled = settings.LOG_TO_JSON
 
         logger.remove()
 
@@ -118,7 +219,7 @@ def _setup_logger() -> None:
         sinks = [
             {
                 "sink": sys.stderr,
-                "level": settings.LOG_LEVEL_CONSOLE,
+                "level": level_console,
                 "format": console_format,
                 "colorize": True,
                 "filter": _sensitive_filter,
@@ -129,7 +230,7 @@ def _setup_logger() -> None:
             },
             {
                 "sink": str(log_file),
-                "level": settings.LOG_LEVEL_FILE,
+                "level": level_file,
                 "format": (
                     "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level:<8} | "
                     "{module:<30} | {function:<20} | {line:<4} | {message}"
@@ -142,11 +243,12 @@ def _setup_logger() -> None:
                 "filter": _sensitive_filter,
                 "backtrace": settings.DEBUG_MODE,
                 "diagnose": settings.DEBUG_MODE,
-                "enabled": settings.LOG_LEVEL_FILE is not False,
+                "enabled": file_enabled,
+                "queue": "file",
             },
             {
                 "sink": str(json_log_file),
-                "level": settings.LOG_LEVEL_FILE,
+                "level": level_file,
                 "serialize": True,
                 "rotation": settings.LOG_ROTATION,
                 "retention": settings.LOG_RETENTION,
@@ -156,21 +258,23 @@ def _setup_logger() -> None:
                 "filter": _sensitive_filter,
                 "backtrace": settings.DEBUG_MODE,
                 "diagnose": settings.DEBUG_MODE,
-                "enabled": settings.LOG_TO_JSON,
+                "enabled": json_enabled,
+                "queue": "json",
             },
         ]
 
         for sink_config in sinks:
             if sink_config.get("enabled", True):
                 logger.debug(f"Добавление приёмника: {sink_config['sink']} (PID: {os.getpid()})")
-                logger.add(**{k: v for k, v in sink_config.items() if k != "enabled"})
+                options = {k: v for k, v in sink_config.items() if k not in ("enabled", "queue")}
+                if settings.LOG_ASYNC_LOGGING and "queue" in sink_config:
+                    for queued_options in _queued_sinks(options, sink_config["queue"]):
+                        logger.add(**queued_options)
+                else:
+                    logger.add(**options)
 
-        if settings.LOG_CAPTURE_EXCEPTIONS:
-            def log_excepthook(exc_type, exc_value, exc_traceback):
-                logger.bind(module="excepthook").opt(exception=(exc_type, exc_value, exc_traceback)).error(
-                    "Необработанное исключение"
-                )
-            sys.excepthook = log_excepthook
+        if settings.LOG_CAPTURE_EXCEPTIONS and sys.excepthook is not _log_excepthook:
+            sys.excepthook = _log_excepthook
 
         logger.debug(f"Логгер инициализирован, активных приёмников: {len([s for s in sinks if s.get('enabled', True)])} (PID: {os.getpid()})")
         _logger_initialized = True
@@ -182,6 +286,13 @@ def _setup_logger() -> None:
 
 _logger_initialized = False
 
+# Уровень, заданный через init_logger/set_log_level. Settings неизменяемы,
+# поэтому переопределение хранится здесь и имеет приоритет над LOG_LEVEL_*
+_log_level: Optional[str] = None
+
+# Уже привязанные логгеры модулей: повторный вызов get_module_logger не делает bind
+_module_loggers: Dict[str, "logger"] = {}
+
 
 def init_logger(level: Optional[str] = None) -> None:
     """
@@ -190,11 +301,11 @@ def init_logger(level: Optional[str] = None) -> None:
     Args:
         level: Уровень логирования ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL").
     """
-    global _logger_initialized
+    global _logger_initialized, _log_level
+    settings = get_settings()
     if not _logger_initialized:
         default_level = level or ("DEBUG" if settings.DEBUG_MODE else "INFO")
-        settings.LOG_LEVEL_FILE = default_level.upper()
-        settings.LOG_LEVEL_CONSOLE = default_level.upper()
+        _log_level = default_level.upper()
         logger.debug(f"Инициализация логгера с уровнем: {default_level} (PID: {os.getpid()})")
         _setup_logger()
 
@@ -206,13 +317,14 @@ def set_log_level(level: str) -> None:
     Args:
         level: Уровень логирования ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL").
     """
+    global _logger_initialized, _log_level
     valid_levels = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
     if level.upper() not in valid_levels:
         raise ValueError(f"Недопустимый уровень логирования: {level}. Допустимые: {valid_levels}")
     logger.debug(f"Установка уровня логирования: {level.upper()} (PID: {os.getpid()})")
-    settings.LOG_LEVEL_FILE = level.upper()
-    settings.LOG_LEVEL_CONSOLE = level.upper()
+    _log_level = level.upper()
     logger.remove()
+    _logger_initialized = False
     _setup_logger()
 
 
@@ -226,16 +338,18 @@ def get_module_logger(module_name: Optional[str] = None) -> logger:
     Returns:
         Logger: Экземпляр логгера.
     """
-    import inspect
-    global _logger_initialized
+    if module_name is None:
+        module_name = sys._getframe(1).f_globals.get('__name__', 'unknown')
+    bound = _module_loggers.get(module_name)
+    if bound is not None:
+        return bound
+
     if not _logger_initialized:
-        default_level = "DEBUG" if settings.DEBUG_MODE else "INFO"
+        default_level = "DEBUG" if get_settings().DEBUG_MODE else "INFO"
         logger.debug(f"Автоматическая инициализация логгера с уровнем: {default_level} (PID: {os.getpid()})")
         init_logger(level=default_level)
-    if module_name is None:
-        frame = inspect.currentframe().f_back
-        module_name = frame.f_globals.get('__name__', 'unknown')
-    return logger.bind(module=module_name)
+    bound = _module_loggers[module_name] = logger.bind(module=module_name)
+    return bound
 
 
 __all__ = ['get_module_logger', 'LoggingSetupError', 'init_logger', 'set_log_level']
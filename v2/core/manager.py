@@ -1,12 +1,17 @@
 # -*- coding: utf-8 -*-
 
-from datetime import datetime, date, timedelta
-from typing import List, Dict, Tuple, Union
+from datetime import datetime, date
+from time import perf_counter_ns
+from typing import Dict, Iterator, List, Tuple, Union
 
-from core.config import settings
+from core.config import get_settings
 from core.logging import get_module_logger
 from database.database import Database
 from database.models import Employee
+from database.normalizers import normalize_name
+
+# Размер пулов имён, из которых собираются тестовые данные
+NAME_POOL_SIZE = 10000
 
 
 class EmployeeManager:
@@ -19,12 +24,24 @@ class EmployeeManager:
         :param db_type: Тип БД (если None, берется из настроек)
         """
         self.logger = get_module_logger(__name__)
+        settings = get_settings()
         self.db = Database(
             db_type=db_type or settings.DB_TYPE,
             db_name=settings.DB_NAME
         )
         self.logger.info(f"EmployeeManager initialized with DB type: {str(self.db.db_type)}")
 
+    def __enter__(self) -> 'EmployeeManager':
+        self.db.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Закрывает соединение с БД"""
+        self.db.close()
+
     def table_exists(self) -> bool:
         """
         Проверяет существование таблицы employees
@@ -33,7 +50,8 @@ class EmployeeManager:
         """
         try:
             exists = self.db.table_exists()
-            self.logger.debug(f"Table exists check: {exists}")
+            # Аргумент форматируется Loguru только если debug-сообщение кто-то принимает
+            self.logger.debug("Table exists check: {}", exists)
             return exists
         except Exception as e:
             self.logger.error(f"Failed to check table existence: {str(e)}")
@@ -119,11 +137,7 @@ class EmployeeManager:
                     birth_date=emp_data['birth_date'],
                     gender=emp_data['gender']
                 )
-                valid_employees.append({
-                    'full_name': emp.full_name,
-                    'birth_date': emp.birth_date,
-                    'gender': emp.gender
-                })
+                valid_employees.append((emp.full_name, emp.birth_date, emp.gender))
             except (KeyError, ValueError) as e:
                 error_count += 1
                 self.logger.warning(f"Invalid employee data in batch: {str(e)}")
@@ -139,29 +153,23 @@ class EmployeeManager:
             self.logger.error(f"Batch insert failed: {str(e)}")
             raise RuntimeError("Failed to perform batch insert") from e
 
-    def get_all_employees(self) -> List[Employee]:
+    def get_all_employees(self) -> Iterator[Employee]:
         """
-        Получает список всех сотрудников
+        Получает всех сотрудников. Объекты Employee отдаются по мере обхода.
 
-        :return: Список объектов Employee
+        :return: Итератор объектов Employee
         :raises RuntimeError: При ошибках базы данных
         """
         self.ensure_table_exists()
         self.logger.debug("Fetching all employees")
 
         try:
-            db_employees = self.db.get_all_employees()
-            employees = []
-
-            for emp_data in db_employees:
-                employees.append(Employee(
-                    full_name=emp_data['full_name'],
-                    birth_date=emp_data['birth_date'],
-                    gender=emp_data['gender']
-                ))
+            count = 0
+            for employee in self.db.get_all_employees():
+                count += 1
+                yield employee
 
-            self.logger.info(f"Fetched {len(employees)} employees")
-            return employees
+            self.logger.info(f"Fetched {count} employees")
 
         except Exception as e:
             self.logger.error(f"Failed to fetch employees: {str(e)}")
@@ -178,13 +186,13 @@ class EmployeeManager:
         self.logger.debug("Querying male employees with F surname")
         return self.db.get_employees_by_gender_and_name_start('Male', 'F')
 
-    def optimize_and_test(self) -> Dict[str, Union[timedelta, float]]:
+    def optimize_and_test(self) -> Dict[str, float]:
         """
         Оптимизирует БД и замеряет производительность до/после
 
         :return: Словарь с результатами {
-            'before': timedelta,
-            'after': timedelta,
+            'before': float (секунды),
+            'after': float (секунды),
             'improvement': float
         }
         """
@@ -192,17 +200,17 @@ class EmployeeManager:
 
         try:
             # Замер ДО оптимизации
-            start = datetime.now()
+            start = perf_counter_ns()
             self.db.get_employees_by_gender_and_name_start("Male", "F")
-            time_before = datetime.now() - start
+            time_before = (perf_counter_ns() - start) / 1e9
 
             # Оптимизация
             self.db.create_indexes()
 
             # Замер ПОСЛЕ оптимизации
-            start = datetime.now()
+            start = perf_counter_ns()
             self.db.get_employees_by_gender_and_name_start("Male", "F")
-            time_after = datetime.now() - start
+            time_after = (perf_counter_ns() - start) / 1e9
 
             improvement = (time_before - time_after) / time_before * 100
 
@@ -236,35 +244,44 @@ class EmployeeManager:
         total_added = 0
         special_added = 0
 
+        # Пулы имён генерируются Faker один раз и сразу нормализуются как в Employee,
+        # дальше строки собираются выборкой из пулов, без вызова Faker на каждую запись
+        last_names = [normalize_name(fake.last_name()) for _ in range(NAME_POOL_SIZE)]
+        male_names = [normalize_name(fake.first_name_male()) for _ in range(NAME_POOL_SIZE)]
+        female_names = [normalize_name(fake.first_name_female()) for _ in range(NAME_POOL_SIZE)]
+        # Даты рождения для возраста 18-65 лет (границы с запасом на високосные годы)
+        today = date.today().toordinal()
+        birth_dates = [date.fromordinal(day) for day in range(today - 66 * 365 + 1, today - 18 * 366 + 1)]
+
         try:
-            # Основные данные
-            for _ in tqdm(range(count // batch_size), desc="Generating data"):
-                batch = []
-                for _ in range(batch_size):
-                    gender = random.choice(['Male', 'Female'])
-                    first_name = fake.first_name_male() if gender == 'Male' else fake.first_name_female()
-                    last_name = fake.last_name()
-                    batch.append({
-                        'full_name': f"{last_name} {first_name}",
-                        'birth_date': fake.date_of_birth(minimum_age=18, maximum_age=65),
-                        'gender': gender
-                    })
-
-                added = self.batch_add_employees(batch)
-                total_added += added
-
-            # Специальные записи (мужчины на F)
-            # На тот случай если рандом не создаст записей начинающихся на F
-            special_batch = []
-            for _ in range(special_count):
-                special_batch.append({
-                    'full_name': f"Fake_{fake.last_name()} {fake.first_name_male()}",
-                    'birth_date': fake.date_of_birth(minimum_age=18, maximum_age=65),
-                    'gender': 'Male'
-                })
-
-            special_added = self.batch_add_employees(special_batch)
-            total_added += special_added
+            # Вся генерация выполняется одной транзакцией
+            with self.db.bulk_load():
+                # Основные данные
+                for _ in tqdm(range(count // batch_size), desc="Generating data"):
+                    batch = [
+                        (f"{last} {male if gender == 'Male' else female}", birth_date, gender)
+                        for gender, last, male, female, birth_date in zip(
+                            random.choices(('Male', 'Female'), k=batch_size),
+                            random.choices(last_names, k=batch_size),
+                            random.choices(male_names, k=batch_size),
+                            random.choices(female_names, k=batch_size),
+                            random.choices(birth_dates, k=batch_size)
+                        )
+                    ]
+                    total_added += self.db.batch_insert_employees(batch)
+
+                # Специальные записи (мужчины на F)
+                # На тот случай если рандом не создаст записей начинающихся на F
+                special_batch = [
+                    (normalize_name(f"Fake_{last} {male}"), birth_date, 'Male')
+                    for last, male, birth_date in zip(
+                        random.choices(last_names, k=special_count),
+                        random.choices(male_names, k=special_count),
+                        random.choices(birth_dates, k=special_count)
+                    )
+                ]
+                special_added = self.db.batch_insert_employees(special_batch)
+                total_added += special_added
 
             self.logger.info(
                 f"Test data generation complete. Total: {total_added}, Special: {special_added}"
@@ -291,21 +308,11 @@ class EmployeeManager:
         self.logger.info(f"Searching employees: gender={gender}, name_start={name_start}")
 
         try:
-            db_results, exec_time = self.db.get_employees_by_gender_and_name_start(
+            # LIKE регистрозависимый, а ФИО хранятся нормализованными
+            return self.db.get_employees_by_gender_and_name_start(
                 gender=gender,
-                name_start=name_start
+                name_start=normalize_name(name_start)
             )
-
-            employees = [
-                Employee(
-                    full_name=emp['full_name'],
-                    birth_date=emp['birth_date'],
-                    gender=emp['gender']
-                )
-                for emp in db_results
-            ]
-
-            return employees, exec_time
         except Exception as e:
             self.logger.error(f"Search failed: {str(e)}")
             raise RuntimeError("Failed to perform search") from e
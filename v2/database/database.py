@@ -2,10 +2,126 @@
 
 import sqlite3
 import psycopg2
-from typing import List, Dict, Tuple, Optional, Union
+import psycopg2.extras
+from contextlib import contextmanager
+from typing import Iterator, List, Tuple, Optional, Union
 from datetime import date, datetime
 import time
+from core.config import get_settings
 from core.logging import get_module_logger
+from database.models import Employee
+
+# Кэш страниц SQLite (КБ) на время массовой загрузки
+BULK_LOAD_CACHE_KB = 200000
+
+# Размер порции строк при потоковом чтении (fetchmany)
+FETCH_BATCH = 10_000
+
+
+def _convert_date(value: bytes) -> date:
+    """Разбирает DATE из SQLite (YYYY-MM-DD) срезами, без strptime"""
+    return date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+
+
+def _convert_timestamp(value: bytes) -> datetime:
+    """Разбирает TIMESTAMP из SQLite (YYYY-MM-DD HH:MM:SS)"""
+    return datetime.fromisoformat(value.decode())
+
+
+def _employee_row(cursor: sqlite3.Cursor, row: Tuple) -> Employee:
+    """row_factory: строка (full_name, birth_date, gender) сразу в Employee"""
+    return Employee.from_row(*row)
+
+
+# Колонки, объявленные как DATE/TIMESTAMP, SQLite сразу отдаёт объектами Python
+sqlite3.register_converter("DATE", _convert_date)
+sqlite3.register_converter("TIMESTAMP", _convert_timestamp)
+# Объекты date передаются в запросы как есть и сохраняются в формате YYYY-MM-DD
+sqlite3.register_adapter(date, date.isoformat)
+
+
+# SQL для каждого диалекта; Database выбирает нужный словарь один раз в __init__
+_SQL = {
+    'sqlite': {
+        'create_table': """
+                CREATE TABLE IF NOT EXISTS employees
+                (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    full_name TEXT NOT NULL,
+                    birth_date DATE NOT NULL,
+                    gender TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+                """,
+        'insert_one': """
+                INSERT INTO employees (full_name, birth_date, gender)
+                VALUES (?, ?, ?) RETURNING id
+                """,
+        'insert_many': """
+                INSERT INTO employees (full_name, birth_date, gender)
+                VALUES (?, ?, ?)
+                """,
+        'select_all': """
+                SELECT full_name, birth_date, gender
+                FROM employees
+                ORDER BY full_name
+                """,
+        'select_gender_like': """
+                SELECT full_name, birth_date, gender
+                FROM employees
+                WHERE gender = ?
+                  AND full_name LIKE ?
+                """,
+        'table_exists': "SELECT name FROM sqlite_master WHERE type='table' AND name='employees'",
+        'index_gender_name': """
+                CREATE INDEX IF NOT EXISTS idx_gender_name
+                    ON employees(gender, full_name)
+                """,
+    },
+    'postgresql': {
+        'create_table': """
+                CREATE TABLE IF NOT EXISTS employees
+                (
+                    id SERIAL PRIMARY KEY,
+                    full_name VARCHAR(50) NOT NULL,
+                    birth_date DATE NOT NULL,
+                    gender VARCHAR(10) NOT NULL,
+                    created_at TIMESTAMP DEFAULT NOW()
+                )
+                """,
+        'insert_one': """
+                INSERT INTO employees (full_name, birth_date, gender)
+                VALUES (%s, %s, %s) RETURNING id
+                """,
+        # Многострочный INSERT ... VALUES для execute_values
+        'insert_many': """
+                INSERT INTO employees (full_name, birth_date, gender)
+                VALUES %s
+                """,
+        'select_all': """
+                SELECT full_name, birth_date, gender
+                FROM employees
+                ORDER BY full_name
+                """,
+        'select_gender_like': """
+                SELECT full_name, birth_date, gender
+                FROM employees
+                WHERE gender = %s
+                  AND full_name LIKE %s
+                """,
+        'table_exists': """
+                SELECT table_name
+                FROM information_schema.tables
+                WHERE table_schema = 'public'
+                  AND table_name = 'employees'
+                """,
+        # Для LIKE 'F%' в PostgreSQL нужен класс операторов varchar_pattern_ops
+        'index_gender_name': """
+                CREATE INDEX IF NOT EXISTS idx_gender_name
+                    ON employees(gender, full_name varchar_pattern_ops)
+                """,
+    },
+}
 
 
 class Database:
@@ -17,19 +133,52 @@ class Database:
 
         :param db_type: Тип БД ('sqlite' или 'postgresql')
         :param db_name: Имя базы данных
+        :raises ValueError: Если тип БД не поддерживается
         """
+        if db_type not in _SQL:
+            raise ValueError(f"Unsupported database type: {db_type}")
         self.logger = get_module_logger(__name__)
         self.db_type = db_type
         self.db_name = db_name
+        self._sql = _SQL[db_type]
         self.conn = None
+        self._in_bulk_load = False
+        # Результат проверки существования таблицы (таблица не удаляется приложением)
+        self._table_exists = False
+
+    def __enter__(self) -> 'Database':
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
     def connect(self) -> None:
-        """Устанавливает соединение с базой данных"""
+        """
+        Устанавливает соединение с базой данных.
+        Соединение одно на весь срок жизни объекта, повторный вызов ничего не делает.
+        """
+        if self.conn is not None:
+            return
         try:
             if self.db_type == 'sqlite':
-                self.conn = sqlite3.connect(self.db_name)
+                self.conn = sqlite3.connect(
+                    self.db_name,
+                    detect_types=sqlite3.PARSE_DECLTYPES | sqlite3.PARSE_COLNAMES
+                )
                 # Включение поддержки внешних ключей для SQLite
                 self.conn.execute("PRAGMA foreign_keys = ON")
+                # Регистрозависимый LIKE: только так LIKE 'F%' использует индекс по full_name
+                self.conn.execute("PRAGMA case_sensitive_like = ON")
+                # Настройки производительности (WAL, кэш страниц, mmap)
+                settings = get_settings()
+                self.conn.executescript(f"""
+                    PRAGMA journal_mode={settings.DB_JOURNAL_MODE};
+                    PRAGMA synchronous={settings.DB_SYNCHRONOUS};
+                    PRAGMA temp_store=MEMORY;
+                    PRAGMA cache_size=-{settings.DB_CACHE_KB};
+                    PRAGMA mmap_size={settings.DB_MMAP_BYTES};
+                """)
             elif self.db_type == 'postgresql':
                 self.conn = psycopg2.connect(
                     host="localhost",
@@ -49,29 +198,83 @@ class Database:
             self.conn.close()
             self.conn = None
 
-    def _execute(self, query: str, params: Tuple = None, fetch: bool = False) -> Optional[List[Tuple]]:
+    def _commit(self) -> None:
+        """Фиксирует транзакцию, если не идёт массовая загрузка"""
+        if not self._in_bulk_load:
+            self.conn.commit()
+
+    @contextmanager
+    def bulk_load(self) -> Iterator['Database']:
+        """
+        Контекст массовой загрузки: все вставки внутри выполняются одной
+        транзакцией с одним COMMIT в конце (или ROLLBACK при ошибке)
+        """
+        self.connect()
+        if self.db_type == 'sqlite':
+            self.conn.execute(f"PRAGMA cache_size=-{BULK_LOAD_CACHE_KB}")
+            self.conn.execute("BEGIN IMMEDIATE")
+        self._in_bulk_load = True
+        try:
+            yield self
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        finally:
+            self._in_bulk_load = False
+            if self.db_type == 'sqlite':
+                self.conn.execute(f"PRAGMA cache_size=-{get_settings().DB_CACHE_KB}")
+
+    def _execute(self, query: str, params: Tuple = None, fetch: bool = False,
+                 readonly: bool = False) -> Optional[List[Tuple]]:
         """
         Универсальный метод выполнения SQL-запросов
 
         :param query: SQL-запрос
         :param params: Параметры запроса
         :param fetch: Нужно ли возвращать результат
+        :param readonly: Запрос только читает данные, COMMIT после него не нужен
         :return: Результат запроса или None
         """
         cursor = None
+        self.connect()
         try:
-            self.connect()
             cursor = self.conn.cursor()
             cursor.execute(query, params or ())
+            result = cursor.fetchall() if fetch else None
+            if not readonly:
+                self._commit()
+            return result
+
+        except Exception as e:
+            if self.conn:
+                self.conn.rollback()
+            raise RuntimeError(f"Database error: {str(e)}")
+        finally:
+            if cursor:
+                cursor.close()
 
-            if fetch:
+    def _fetch_employees(self, query: str, params: Tuple = None) -> List[Employee]:
+        """
+        Выполняет SELECT (full_name, birth_date, gender) и возвращает объекты Employee
+        без промежуточных словарей. Запрос только читает данные, поэтому без COMMIT
+
+        :param query: SQL-запрос
+        :param params: Параметры запроса
+        :return: Список сотрудников
+        """
+        cursor = None
+        self.connect()
+        try:
+            cursor = self.conn.cursor()
+            if self.db_type == 'sqlite':
+                cursor.row_factory = _employee_row
+                cursor.execute(query, params or ())
                 result = cursor.fetchall()
-                self.conn.commit()
-                return result
             else:
-                self.conn.commit()
-                return None
-
+                cursor.execute(query, params or ())
+                result = [Employee.from_row(*row) for row in cursor.fetchall()]
+            return result
         except Exception as e:
             if self.conn:
                 self.conn.rollback()
@@ -79,35 +282,11 @@ class Database:
         finally:
             if cursor:
                 cursor.close()
-            self.close()
 
     def create_table(self) -> None:
         """Создает таблицу employees, если она не существует"""
-        if self.db_type == 'sqlite':
-            query = """
-                    CREATE TABLE IF NOT EXISTS employees
-                    (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        full_name TEXT NOT NULL,
-                        birth_date DATE NOT NULL,
-                        gender TEXT NOT NULL,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                    )
-                    """
-        else:  # postgresql
-            query = """
-                    CREATE TABLE IF NOT EXISTS employees
-                    (
-                        id SERIAL PRIMARY KEY,
-                        full_name VARCHAR(50) NOT NULL,
-                        birth_date DATE NOT NULL,
-                        gender VARCHAR(10) NOT NULL,
-                        created_at TIMESTAMP DEFAULT NOW
-                    (
-                    )
-                        )
-                    """
-        self._execute(query)
+        self._execute(self._sql['create_table'])
+        self._table_exists = True
 
     def insert_employee(self, full_name: str, birth_date: Union[date, str], gender: str) -> int:
         """
@@ -121,94 +300,74 @@ class Database:
         if isinstance(birth_date, str):
             birth_date = datetime.strptime(birth_date, '%Y-%m-%d').date()
 
-        if self.db_type == 'sqlite':
-            query = """
-                    INSERT INTO employees (full_name, birth_date, gender)
-                    VALUES (?, ?, ?) RETURNING id
-                    """
-        else:
-            query = """
-                    INSERT INTO employees (full_name, birth_date, gender)
-                    VALUES (%s, %s, %s) RETURNING id
-                    """
-
         result = self._execute(
-            query,
-            (full_name, birth_date.isoformat(), gender),
+            self._sql['insert_one'],
+            (full_name, birth_date, gender),
             fetch=True
         )
         return result[0][0] if result else None
 
-    def batch_insert_employees(self, employees: List[Dict[str, Union[str, date]]]) -> int:
+    def batch_insert_employees(self, employees: List[Tuple[str, Union[date, str], str]]) -> int:
         """
         Массовое добавление сотрудников
 
-        :param employees: Список словарей с данными сотрудников
+        :param employees: Список кортежей (full_name, birth_date, gender)
         :return: Количество добавленных записей
         """
         if not employees:
             return 0
 
-        # Подготовка данных
-        data = [
-            (
-                emp['full_name'],
-                emp['birth_date'].isoformat() if isinstance(emp['birth_date'], date) else emp['birth_date'],
-                emp['gender']
-            )
-            for emp in employees
-        ]
-
-        if self.db_type == 'sqlite':
-            query = """
-                    INSERT INTO employees (full_name, birth_date, gender)
-                    VALUES (?, ?, ?)
-                    """
-        else:
-            query = """
-                    INSERT INTO employees (full_name, birth_date, gender)
-                    VALUES (%s, %s, %s)
-                    """
-
+        query = self._sql['insert_many']
+        cursor = None
+        self.connect()
         try:
-            self.connect()
             cursor = self.conn.cursor()
-            cursor.executemany(query, data)
-            self.conn.commit()
-            return cursor.rowcount
+            if self.db_type == 'sqlite':
+                cursor.executemany(query, employees)
+                added = cursor.rowcount
+            else:
+                # Многострочный INSERT ... VALUES страницами, а не запрос на каждую строку
+                psycopg2.extras.execute_values(cursor, query, employees, page_size=1000)
+                added = len(employees)
+            self._commit()
+            return added
         except Exception as e:
             self.conn.rollback()
             raise RuntimeError(f"Batch insert failed: {str(e)}")
         finally:
             if cursor:
                 cursor.close()
-            self.close()
 
-    def get_all_employees(self) -> List[Dict[str, Union[str, date, int]]]:
+    def get_all_employees(self) -> Iterator[Employee]:
         """
-        Получает список всех сотрудников
+        Получает всех сотрудников потоком: строки читаются порциями по FETCH_BATCH,
+        вся выборка в памяти не собирается
 
-        :return: Список словарей с информацией о сотрудниках
+        :return: Итератор объектов Employee
         """
-        query = """
-                SELECT id, full_name, birth_date, gender, created_at
-                FROM employees
-                ORDER BY full_name
-                """
-        result = self._execute(query, fetch=True)
-
-        employees = []
-        for row in result:
-            employees.append({
-                'id': row[0],
-                'full_name': row[1],
-                'birth_date': datetime.strptime(row[2], '%Y-%m-%d').date() if isinstance(row[2], str) else row[2],
-                'gender': row[3],
-                'created_at': row[4]
-            })
-        return employees
-
-    def get_employees_by_gender_and_name_start(self, gender: str, name_start: str) -> Tuple[List[Dict], float]:
+        self.connect()
+        if self.db_type == 'sqlite':
+            cursor = self.conn.cursor()
+            cursor.row_factory = _employee_row
+        else:
+            # Именованный (серверный) курсор: PostgreSQL отдаёт строки порциями
+            cursor = self.conn.cursor(name='employees_stream')
+        try:
+            cursor.execute(self._sql['select_all'])
+            while True:
+                rows = cursor.fetchmany(FETCH_BATCH)
+                if not rows:
+                    break
+                if self.db_type == 'sqlite':
+                    yield from rows
+                else:
+                    yield from (Employee.from_row(*row) for row in rows)
+        except Exception as e:
+            raise RuntimeError(f"Database error: {str(e)}")
+        finally:
+            cursor.close()
+
+    def get_employees_by_gender_and_name_start(self, gender: str, name_start: str) -> Tuple[List[Employee], float]:
         """
         Получает сотрудников по полу и первой букве фамилии с замером времени
 
@@ -216,34 +375,13 @@ class Database:
         :param name_start: Первая буква фамилии
         :return: (Список сотрудников, время выполнения в секундах)
         """
-        start_time = time.time()
-
-        query = """
-                SELECT id, full_name, birth_date, gender
-                FROM employees
-                WHERE gender = ?
-                  AND full_name LIKE ?
-                """ if self.db_type == 'sqlite' else """
-                                                     SELECT id, full_name, birth_date, gender
-                                                     FROM employees
-                                                     WHERE gender = %s
-                                                       AND full_name LIKE %s
-                                                     """
+        start_time = time.perf_counter_ns()
 
         params = (gender, f"{name_start}%")
         try:
-            result = self._execute(query, params, fetch=True)
-
-            employees = []
-            for row in result:
-                employees.append({
-                    'id': row[0],
-                    'full_name': row[1],
-                    'birth_date': datetime.strptime(row[2], '%Y-%m-%d').date() if isinstance(row[2], str) else row[2],
-                    'gender': row[3]
-                })
-
-            execution_time = time.time() - start_time
+            employees = self._fetch_employees(self._sql['select_gender_like'], params)
+
+            execution_time = (time.perf_counter_ns() - start_time) / 1e9
             self.logger.info(
                 f"Query returned {len(employees)} employees in {execution_time:.4f} seconds"
             )
@@ -256,15 +394,16 @@ class Database:
     def create_indexes(self):
         """Создает оптимизированные индексы"""
         self.connect()
+        cursor = self.conn.cursor()
         try:
-            cursor = self.conn.cursor()
             # TODO: Проверку, нужно ли создавать данные индексы
 
-            # Основной составной индекс для нашего запроса
-            cursor.execute("""
-                           CREATE INDEX IF NOT EXISTS idx_gender_fname
-                               ON employees(gender, substr(full_name, 1, 1))
-                           """)
+            # Индекс по substr() не применяется к LIKE 'F%', заменён на idx_gender_name
+            cursor.execute("DROP INDEX IF EXISTS idx_gender_fname")
+
+            # Основной составной индекс для нашего запроса: gender = ? AND full_name LIKE 'F%'
+            # превращается в диапазон по индексу
+            cursor.execute(self._sql['index_gender_name'])
 
             # Дополнительные индексы для других возможных запросов
             cursor.execute("""
@@ -277,21 +416,16 @@ class Database:
                                ON employees(birth_date)
                            """)
 
+            # Статистика для планировщика, чтобы он выбирал новые индексы
+            cursor.execute("ANALYZE employees")
+
             self.conn.commit()
         finally:
-            self.close()
+            cursor.close()
 
     def table_exists(self) -> bool:
-        """Проверяет, существует ли таблица employees"""
-        if self.db_type == 'sqlite':
-            query = "SELECT name FROM sqlite_master WHERE type='table' AND name='employees'"
-        else:
-            query = """
-                    SELECT table_name
-                    FROM information_schema.tables
-                    WHERE table_schema = 'public'
-                      AND table_name = 'employees'
-                    """
-
-        result = self._execute(query, fetch=True)
-        return bool(result)
+        """Проверяет, существует ли таблица employees (положительный результат кэшируется)"""
+        if self._table_exists:
+            return True
+        self._table_exists = bool(self._execute(self._sql['table_exists'], fetch=True, readonly=True))
+        return self._table_exists
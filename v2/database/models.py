@@ -1,10 +1,13 @@
 # -*- coding: utf-8 -*-
 
 from dataclasses import dataclass
-from datetime import date, datetime
+from datetime import date
+from typing import Iterable, List, Optional
 
+from database.normalizers import normalize_gender, normalize_name
 
-@dataclass
+
+@dataclass(slots=True)
 class Employee:
     """Модель сотрудника с валидацией данных"""
     full_name: str
@@ -15,25 +18,42 @@ class Employee:
         self.full_name = self._normalize_name(self.full_name)
         self.gender = self._normalize_gender(self.gender)
 
-    @staticmethod
-    def _normalize_name(name: str) -> str:
-        """Приводит ФИО к стандартному формату"""
-        return ' '.join(part.capitalize() for part in name.split())
-
-    @staticmethod
-    def _normalize_gender(gender: str) -> str:
-        """Нормализует ввод пола"""
-        gender = gender.lower()
-        if gender in ('м', 'm', 'male', '1'):
-            return 'Male'
-        elif gender in ('ж', 'f', 'female', '2'):
-            return 'Female'
-        raise ValueError(f"Invalid gender value: {gender}")
-
-    def calculate_age(self) -> int:
-        """Вычисляет возраст на текущую дату"""
-        today = datetime.now().date()
-        age = today.year - self.birth_date.year
-        if (today.month, today.day) < (self.birth_date.month, self.birth_date.day):
-            age -= 1
-        return age
+    @classmethod
+    def from_row(cls, full_name: str, birth_date: date, gender: str) -> 'Employee':
+        """
+        Создает объект из строки БД без повторной нормализации
+        (в БД данные попадают уже нормализованными)
+        """
+        employee = cls.__new__(cls)
+        employee.full_name = full_name
+        employee.birth_date = birth_date
+        employee.gender = gender
+        return employee
+
+    # Нормализация вынесена в database.normalizers
+    _normalize_name = staticmethod(normalize_name)
+    _normalize_gender = staticmethod(normalize_gender)
+
+    def calculate_age(self, today: Optional[date] = None) -> int:
+        """
+        Вычисляет возраст на дату today (по умолчанию - текущую).
+        При расчёте по многим сотрудникам today стоит получить один раз и передавать сюда
+        """
+        if today is None:
+            today = date.today()
+        birth = self.birth_date
+        # bool - это 0/1: вычитается единица, если день рождения в этом году ещё не наступил
+        return today.year - birth.year - ((today.month, today.day) < (birth.month, birth.day))
+
+
+def compute_ages(birth_dates: Iterable[date], today: Optional[date] = None) -> List[int]:
+    """
+    Вычисляет возраст для набора дат рождения за один проход
+    :param birth_dates: даты рождения
+    :param today: дата, на которую считается возраст (по умолчанию - текущая)
+    :return: список возрастов в том же порядке
+    """
+    if today is None:
+        today = date.today()
+    year, month_day = today.year, (today.month, today.day)
+    return [year - birth.year - (month_day < (birth.month, birth.day)) for birth in birth_dates]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from typing import Optional
+
+
+# Допустимые варианты ввода пола -> нормализованное значение
+GENDER_MAP = {
+    **dict.fromkeys(('м', 'm', 'male', '1'), 'Male'),
+    **dict.fromkeys(('ж', 'f', 'female', '2'), 'Female'),
+}
+
+# Локальная ссылка на метод, чтобы не искать атрибут на каждом слове
+_cap = str.capitalize
+
+
+def normalize_name(name: str) -> str:
+    """
+    Приводит ФИО к стандартному формату: лишние пробелы убираются, слова с заглавной буквы
+    :param name: ФИО в произвольном виде
+    :return: нормализованное ФИО
+    """
+    return ' '.join(map(_cap, name.split()))
+
+
+def normalize_gender(gender: str, default: Optional[str] = None) -> str:
+    """
+    Нормализует ввод пола одним поиском по GENDER_MAP
+    :param gender: пол в любом из допустимых вариантов ввода
+    :param default: значение для нераспознанного ввода; если не задано - ValueError
+    :return: 'Male' или 'Female'
+    """
+    normalized = GENDER_MAP.get(gender.lower(), default)
+    if normalized is None:
+        raise ValueError(f"Invalid gender value: {gender.lower()}")
+    return normalized
@@ -6,6 +6,28 @@ import sys
 
 BASE_URL = "http://127.0.0.1:8000"
 
+# Одна сессия на всё время работы клиента: соединение с сервером переиспользуется (keep-alive),
+# а крупные ответы приходят сжатыми
+_session = requests.Session()
+_session.headers['Accept-Encoding'] = 'gzip'
+
+MENU = """
+=== Employee Database ===
+1. Создать таблицу (автоматически при запуске)
+2. Добавить сотрудника
+3. Показать всех сотрудников
+4. Сгенерировать тестовые данные
+5. Найти мужчин с фамилией на F
+6. Оптимизация базы
+0. Выход
+========================"""
+
+# Формат строки таблицы сотрудников, разбирается один раз
+_format_row = "{:<30} | {}    | {:<6} | {}\n".format
+
+# Сколько строк таблицы собирается в один вызов sys.stdout.write
+PRINT_BATCH = 10000
+
 def print_error(message):
     print(f"\n\033[91mОШИБКА: {message}\033[0m")
 
@@ -13,15 +35,7 @@ def print_success(message):
     print(f"\n\033[92m{message}\033[0m")
 
 def print_menu():
-    print("\n=== Employee Database ===")
-    print("1. Создать таблицу (автоматически при запуске)")
-    print("2. Добавить сотрудника")
-    print("3. Показать всех сотрудников")
-    print("4. Сгенерировать тестовые данные")
-    print("5. Найти мужчин с фамилией на F")
-    print("6. Оптимизация базы")
-    print("0. Выход")
-    print("========================")
+    print(MENU)
 
 def print_employees(employees):
     if not employees:
@@ -33,8 +47,13 @@ def print_employees(employees):
     print(f"{'ФИО':<30} | {'Дата рождения':<12} | {'Пол':<6} | Возраст")
     print("-" * 65)
 
-    for emp in employees:
-        print(f"{emp['full_name']:<30} | {emp['birth_date']}    | {emp['gender']:<6} | {emp['age']}")
+    # Строки выводятся пачками: одна запись в stdout на PRINT_BATCH сотрудников
+    write = sys.stdout.write
+    for start in range(0, len(employees), PRINT_BATCH):
+        write("".join([
+            _format_row(emp['full_name'], emp['birth_date'], emp['gender'], emp['age'])
+            for emp in employees[start:start + PRINT_BATCH]
+        ]))
 
 def handle_command(mode, args):
     try:
@@ -44,27 +63,27 @@ def handle_command(mode, args):
                 "birth_date": args[1],
                 "gender": args[2]
             }
-            response = requests.post(f"{BASE_URL}/employees/", json=data)
+            response = _session.post(f"{BASE_URL}/employees/", json=data)
             if response.status_code == 201:
                 print_success("Сотрудник успешно добавлен")
             else:
                 print_error(response.json().get("detail", "Unknown error"))
         elif mode == '3':
-            response = requests.get(f"{BASE_URL}/employees/")
+            response = _session.get(f"{BASE_URL}/employees/")
             print_employees(response.json())
         elif mode == '4':
             print("Генерируем 1.000.000 записей и 100 записей для 5-го пункта")
-            response = requests.post(f"{BASE_URL}/employees/generate-test-data/")
+            response = _session.post(f"{BASE_URL}/employees/generate-test-data/")
             print_success(response.json()["message"])
         elif mode == '5':
             start_time = datetime.now()
-            response = requests.get(f"{BASE_URL}/employees/male-f/")
+            response = _session.get(f"{BASE_URL}/employees/male-f/")
             execution_time = datetime.now() - start_time
 
             print_employees(response.json())
             print(f"\nВремя выполнения запроса: {execution_time.total_seconds():.4f} секунд")
         elif mode == '6':
-            response = requests.post(f"{BASE_URL}/employees/optimize/")
+            response = _session.post(f"{BASE_URL}/employees/optimize/")
             if response.status_code == 200:
                 result = response.json()
                 print_success(result["message"])